@@ -1,347 +1,174 @@
 # starts off by creating an instance of main_window, containing a plot widget.
 from typing import Callable
+from functools import wraps, cache
+from importlib import import_module
 
-from .table_manager import TableManager
-from .main_window import MainWindow
-from .plot_widget import PlotWidget
-from .helper_funcs import get_cmap
-from .input_widget import InputTable
 from .variables import Variables
-from .plot_manager import PlotManager
-from .custimisation import get_font, get_gradient
 
-from functools import wraps
-
-from pyqtgraph import setConfigOption
-from PySide6.QtCore import QTimer
-
-__all__ = [
+__all__ = (
     "var", "plot", "scatter", "errorbar", "set_xlim", "set_ylim", "xlim", "ylim", "legend", "set_title", "lock_zoom", "subplots",
     "remove_item", "get_gradient", "get_cmap", "inf_dline", "inf_hline", "inf_vline", "grid", "plot_text", "merge_plots", "set_interval",
     "on_refresh", "on_mouse_click", "on_mouse_move", "get_mouse_pos", "on_key_press", "add_slider", "add_checkbox", "add_inputbox", "add_button", "get_font",
     "add_dropdown", "add_rate_slider", "add_input_table", "get_all_boxes", "display_fps", "resize", "benchmark", "set_input_width_ratio",
-    "set_input_partition", "is_alive", "refresh", "show_window", "show", "clear", "export", "export_video", "start_recording"
-]
+    "set_input_partition", "batch_tabs", "is_alive", "refresh", "show_window", "show", "clear", "export", "export_video", "start_recording"
+)
 
-_window = None
-_input_table = None
-_table_manager = None
-var = Variables()
+@cache
+def get_variables():
+    """The namespace `squap.var`, only created once it is used. """
+    return Variables()
 
 
+@cache
 def get_window():
-    global _window
-    if _window is None:
-        _window = MainWindow(var)
-    return _window
+    from .main_window import MainWindow
+    return MainWindow(get_variables())
 
 
+@cache
 def get_input_table():
-    global _input_table
-    if _input_table is None:
-        _input_table = get_window().init_first_tab()
-    return _input_table
+    return get_window().init_first_tab()
 
 
+@cache
 def get_table_manager():
     """Makes sure that when a function from table_manager is called, the input table is initialised."""
-    global _table_manager
-    if _table_manager is None:
-        get_input_table()
-        _table_manager = get_window().table_manager
-    return _table_manager
-
-
-# <editor-fold desc="wrapped functions">
-@wraps(PlotWidget.plot)
-def plot(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.plot(*args, **kwargs)
-
-
-@wraps(PlotWidget.scatter)
-def scatter(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.scatter(*args, **kwargs)
-
-
-@wraps(PlotWidget.errorbar)
-def errorbar(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.errorbar(*args, **kwargs)
-
-
-@wraps(PlotWidget.inf_dline)
-def inf_dline(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.inf_dline(*args, **kwargs)
-
-
-@wraps(PlotWidget.inf_hline)
-def inf_hline(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.inf_hline(*args, **kwargs)
-
-
-@wraps(PlotWidget.inf_vline)
-def inf_vline(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.inf_vline(*args, **kwargs)
-
-
-@wraps(PlotWidget.grid)
-def grid(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.grid(*args, **kwargs)
-
-
-@wraps(PlotWidget.plot_text)
-def plot_text(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.plot_text(*args, **kwargs)
-
-
-@wraps(PlotWidget.imshow)
-def imshow(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.imshow(*args, **kwargs)
-
-
-@wraps(PlotWidget.set_xlim)
-def set_xlim(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.set_xlim(*args, **kwargs)
-
-
-@wraps(PlotWidget.set_ylim)
-def set_ylim(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.set_ylim(*args, **kwargs)
-
-
-@wraps(PlotWidget.xlim)
-def xlim(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.xlim(*args, **kwargs)
-
-
-@wraps(PlotWidget.ylim)
-def ylim(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.ylim(*args, **kwargs)
-
-
-@wraps(PlotWidget.enable_autoscale)
-def enable_autoscale(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.enable_autoscale(*args, **kwargs)
-
-
-@wraps(PlotWidget.disable_autoscale)
-def disable_autoscale(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.disable_autoscale(*args, **kwargs)
-
-
-@wraps(PlotWidget.legend)
-def legend(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.legend(*args, **kwargs)
-
-
-@wraps(PlotWidget.set_title)
-def set_title(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.set_title(*args, **kwargs)
-
-
-@wraps(PlotWidget.lock_zoom)
-def lock_zoom(*args, **kwargs):
-    return get_window().plot_manager.plot_widget.lock_zoom(*args, **kwargs)
-
-
-@wraps(PlotManager.create_subplots)
-def subplots(*args, **kwargs):
-    return get_window().plot_manager.create_subplots(*args, **kwargs)
-
-
-@wraps(PlotManager.remove_item)
-def remove_item(*args, **kwargs):
-    return get_window().plot_manager.remove_item(*args, **kwargs)
-
-
-@wraps(PlotManager.merge_plots)
-def merge_plots(*args, **kwargs):
-    return get_window().plot_manager.merge_plots(*args, **kwargs)
-
-
-@wraps(MainWindow.set_interval)
-def set_interval(*args, **kwargs):
-    return get_window().set_interval(*args, **kwargs)
-
-
-@wraps(MainWindow.is_alive)
-def is_alive():
-    return get_window().is_alive()
-
-
-@wraps(InputTable.add_slider)
-def add_slider(*args, **kwargs):
-    return get_input_table().add_slider(*args, **kwargs)
-
-
-@wraps(InputTable.add_checkbox)
-def add_checkbox(*args, **kwargs):
-    return get_input_table().add_checkbox(*args, **kwargs)
-
-
-@wraps(InputTable.add_inputbox)
-def add_inputbox(*args, **kwargs):
-    return get_input_table().add_inputbox(*args, **kwargs)
-
-
-@wraps(InputTable.add_button)
-def add_button(*args, **kwargs):
-    return get_input_table().add_button(*args, **kwargs)
+    get_input_table()
+    return get_window().table_manager
 
 
-@wraps(InputTable.add_dropdown)
-def add_dropdown(*args, **kwargs):
-    return get_input_table().add_dropdown(*args, **kwargs)
+@cache
+def get_plot_manager():
+    return get_window().plot_manager
 
 
-@wraps(InputTable.add_rate_slider)
-def add_rate_slider(*args, **kwargs):
-    return get_input_table().add_rate_slider(*args, **kwargs)
+def get_plot_widget():
+    return get_plot_manager().plot_widget
 
 
-@wraps(InputTable.add_color_picker)
-def add_color_picker(*args, **kwargs):
-    return get_input_table().add_color_picker(*args, **kwargs)
-
-
-@wraps(MainWindow.on_mouse_click)
-def on_mouse_click(*args, **kwargs):
-    return get_window().on_mouse_click(*args, **kwargs)
-
-
-@wraps(MainWindow.on_mouse_move)
-def on_mouse_move(*args, **kwargs):
-    return get_window().on_mouse_move(*args, **kwargs)
-
-
-@wraps(MainWindow.get_mouse_pos)
-def get_mouse_pos(*args, **kwargs):
-    return get_window().get_mouse_pos(*args, **kwargs)
-
-
-@wraps(MainWindow.on_key_press)
-def on_key_press(*args, **kwargs):
-    return get_window().on_key_press(*args, **kwargs)
-
-
-@wraps(MainWindow.add_table)
-def add_input_table(*args, **kwargs):
-    return get_window().add_table(*args, **kwargs)
-
-
-@wraps(TableManager.rename_tab)
-def rename_tab(*args, **kwargs):
-    return get_table_manager().rename_tab(*args, **kwargs)
-
-
-@wraps(TableManager.set_active_tab)
-def set_active_tab(*args, **kwargs):
-    return get_table_manager().set_active_tab(*args, **kwargs)
-
-
-@wraps(TableManager.get_all_tabs)
-def get_all_tabs():
-    return get_table_manager().get_all_tabs()
-
-
-@wraps(TableManager.get_all_boxes)
-def get_all_boxes():
-    return get_table_manager().get_all_boxes()
-
-
-@wraps(TableManager.get_current_row)
-def get_current_row():
-    return get_table_manager().get_current_row()
-
-
-@wraps(TableManager.link_boxes)
-def link_boxes(*args, **kwargs):
-    return get_table_manager().link_boxes(*args, **kwargs)
-
-
-@wraps(TableManager.set_input_partition)
-def set_input_partition(*args, **kwargs):
-    return get_table_manager().set_input_partition(*args, **kwargs)
-
-
-@wraps(MainWindow.resize)
-def resize(*args, **kwargs):
-    return get_window().resize_window(*args, **kwargs)
-
-
-@wraps(MainWindow.window_size)
-def size():
-    return get_window().window_size()
-
-
-@wraps(MainWindow.set_input_width_ratio)
-def set_input_width_ratio(*args, **kwargs):
-    return get_window().set_input_width_ratio(*args, **kwargs)
-
-
-@wraps(MainWindow.display_fps)
-def display_fps(*args, **kwargs):
-    return get_window().display_fps(*args, **kwargs)
-
-
-@wraps(MainWindow.benchmark)
-def benchmark(*args, **kwargs):
-    return get_window().benchmark(*args, **kwargs)
-
-
-@wraps(MainWindow.refresh)
-def refresh(*args, **kwargs):
-    return get_window().refresh(*args, **kwargs)
-
-
-@wraps(MainWindow.show_window)
-def show_window():
-    return get_window().show_window()
-
-
-@wraps(MainWindow.on_refresh)
-def on_refresh(*args, **kwargs):
-    return get_window().on_refresh(*args, **kwargs)
-
-
-@wraps(MainWindow.show)
-def show():
-    return get_window().start()
-
-
-@wraps(MainWindow.close)
-def close_window():
-    return get_window().close()
-
-
-@wraps(MainWindow.clear)
-def clear():
-    return get_window().clear()
-
-
-@wraps(MainWindow.export)
-def export(*args, **kwargs):
-    return get_window().export(*args, **kwargs)
-
-
-@wraps(MainWindow.export_video)
-def export_video(*args, **kwargs):
-    return get_window().export_video(*args, **kwargs)
-
-
-@wraps(MainWindow.start_recording)
-def start_recording(*args, **kwargs):
-    return get_window().start_recording(*args, **kwargs)
+# <editor-fold desc="wrapped functions">
+# The submodules below pull in PySide6 and pyqtgraph, so they are only imported once something from them is actually
+# used. Every forwarded function is built on first access by `__getattr__` and then stored in the module globals.
+_lazy_imports = {       # name: submodule it is defined in
+    "MainWindow": "main_window", "PlotWidget": "plot_widget", "PlotManager": "plot_manager",
+    "InputTable": "input_widget", "TableManager": "table_manager", "get_cmap": "helper_funcs",
+    "get_font": "custimisation", "get_gradient": "custimisation",
+}
+
+_forwarded_names = {    # (getter of the object the calls are forwarded to, class of that object): forwarded names
+    (get_plot_widget, "PlotWidget"): (
+        "plot", "scatter", "errorbar", "inf_dline", "inf_hline", "inf_vline", "grid", "plot_text", "imshow", "set_xlim",
+        "set_ylim", "xlim", "ylim", "enable_autoscale", "disable_autoscale", "legend", "set_title", "lock_zoom",
+    ),
+    (get_plot_manager, "PlotManager"): ("subplots", "remove_item", "merge_plots"),
+    (get_window, "MainWindow"): (
+        "set_interval", "is_alive", "on_mouse_click", "on_mouse_move", "get_mouse_pos", "on_key_press",
+        "add_input_table", "resize", "size", "set_input_width_ratio", "display_fps", "benchmark", "refresh",
+        "show_window", "on_refresh", "show", "close_window", "clear", "export", "export_video", "start_recording",
+    ),
+    (get_input_table, "InputTable"): (
+        "add_slider", "add_checkbox", "add_inputbox", "add_button", "add_dropdown", "add_rate_slider",
+        "add_color_picker",
+    ),
+    (get_table_manager, "TableManager"): (
+        "rename_tab", "set_active_tab", "get_all_tabs", "get_all_boxes", "get_current_row", "link_boxes",
+        "set_input_partition", "batch_tabs",
+    ),
+}
+_method_names = {       # forwarded names that differ from the name of the method
+    "subplots": "create_subplots", "add_input_table": "add_table", "resize": "resize_window", "size": "window_size",
+    "show": "start", "close_window": "close",
+    "is_alive": "isVisible",    # bound directly to the Qt method, as MainWindow.is_alive only wraps it
+}
+_forwarded = {          # name: (getter of the object the call is forwarded to, class of that object, method name)
+    name: (get_owner, class_name, _method_names.get(name, name))
+    for (get_owner, class_name), names in _forwarded_names.items() for name in names
+}
+
+
+def _import_lazy(name):
+    return getattr(import_module(f".{_lazy_imports[name]}", __name__), name)
+
+
+def _forward(name):
+    """Build the function `name`, which forwards its arguments to the method it wraps.
+
+    Except for the plot widget, which is replaced by `clear`, the object a call is forwarded to never changes. So on the
+    first call the forwarder replaces itself in the module globals by the bound method, and later calls to
+    `squap.<name>` go to the method directly. The plot widget is looked up on every call instead, because a bound method
+    of it would keep drawing on the old plot widget, also when it was imported with `from squap import`.
+    """
+    get_owner, class_name, method_name = _forwarded[name]
+
+    if get_owner is get_plot_widget:
+        def func(*args, **kwargs):
+            return getattr(get_plot_widget(), method_name)(*args, **kwargs)
+    else:
+        def func(*args, **kwargs):
+            method = getattr(get_owner(), method_name)
+            globals()[name] = method
+            return method(*args, **kwargs)
+
+    return wraps(getattr(_import_lazy(class_name), method_name))(func)
+
+
+def __getattr__(name):
+    if name in _forwarded:
+        get_owner, _, method_name = _forwarded[name]
+        if get_owner is not get_plot_widget and get_owner.cache_info().currsize:
+            value = getattr(get_owner(), method_name)   # the owner already exists, so no forwarder is needed
+        else:
+            value = _forward(name)
+    elif name in _lazy_imports:
+        value = _import_lazy(name)
+    elif name == "var":
+        value = get_variables()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value     # later lookups don't go through __getattr__ anymore
+    return value
+
+
+def __dir__():
+    # lists the lazy names without building or importing them
+    return sorted({*globals(), *_forwarded, *_lazy_imports, "var"})
 # </editor-fold>
 
 
 def enable_numba(enable: bool = True):
     """Enable numba. Can be a little faster, but takes longer to initialize. """
+    from pyqtgraph import setConfigOption
+    from .helper_funcs import get_numba_func
     setConfigOption('useNumba', enable)
+    if enable:
+        get_numba_func("apply_cmap")        # compiles the image kernel of squap now, rather than on the first imshow
+
+
+_next_refresh_funcs = []       # functions waiting for the next refresh, all called by a single timer
+
+
+def _call_next_refresh_funcs():
+    funcs = _next_refresh_funcs.copy()
+    _next_refresh_funcs.clear()        # functions added while these are called wait for the refresh after
+    for i, func in enumerate(funcs):
+        try:
+            func()
+        except BaseException:
+            remaining = funcs[i + 1:]       # still called on the next refresh, before the functions added meanwhile
+            if remaining:
+                if not _next_refresh_funcs:
+                    from PySide6.QtCore import QTimer
+                    QTimer.singleShot(0, _call_next_refresh_funcs)
+                _next_refresh_funcs[:0] = remaining
+            raise
 
 
 def on_next_refresh(func: Callable):          # todo: only works in eventloop, not in show_window style.
     """Calls a function upon next refresh only. """
-    QTimer.singleShot(0, func)
+    if not _next_refresh_funcs:
+        from PySide6.QtCore import QTimer
+        QTimer.singleShot(0, _call_next_refresh_funcs)
+    _next_refresh_funcs.append(func)
 
 
 # def init_3D():
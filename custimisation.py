@@ -1,10 +1,12 @@
-from .helper_funcs import get_single_color, get_cmap, Font, ColorType
-from typing import Iterable, Callable
-from PySide6.QtGui import QLinearGradient, QRadialGradient, QConicalGradient, QGradient, QCursor, QGuiApplication
+from .helper_funcs import get_single_color, get_cmap, get_stop_positions, get_numba_func, call_cmap, Font, ColorType
+from typing import Iterable, TYPE_CHECKING
+from PySide6.QtGui import QLinearGradient, QRadialGradient, QConicalGradient, QGradient
 from PySide6.QtCore import QPointF
-from matplotlib import colors
 import numpy as np
 
+if TYPE_CHECKING:       # matplotlib is only needed for type hinting, and importing it is slow.
+    from matplotlib import colors
+
 
 def get_font(*args, **kwargs) -> Font:
     """Get font object. Used for defining more complex fonts.
@@ -14,7 +16,7 @@ def get_font(*args, **kwargs) -> Font:
     return Font(*args, **kwargs)
 
 
-def get_gradient(cmap: str | colors.Colormap | Iterable | dict, style: str = "horizontal",
+def get_gradient(cmap: "str | colors.Colormap | Iterable | dict", style: str = "horizontal",
                  position: Iterable | None = None, extend: str = "pad", resolution: int = 256) -> QGradient:
     """Obtain a gradient. Gradients can sometimes be used instead of normal colors.
 
@@ -94,19 +96,27 @@ def get_gradient(cmap: str | colors.Colormap | Iterable | dict, style: str = "ho
     gradient.cmap = cmap
     gradient.style = style
     gradient.resolution = resolution
+    gradient.lut = None         # set by cmap_to_gradient, when the stops are set
     return gradient
 
 
 def cmap_to_colors(cmap, N_points):       # todo: temporary, make this better
-    colors = np.zeros((N_points, 4))
+    positions = get_stop_positions(N_points)
     if isinstance(cmap, dict):
-        col_arr = np.array(list(np.array(get_single_color(col).toTuple()) for col in cmap.values()))
-        x_arr = np.linspace(0, 1, N_points)
-        for i in range(4):
-            colors[:, i] = np.interp(x_arr, list(cmap.keys()), col_arr[:, i])
+        items = sorted(cmap.items())       # np.interp needs increasing keys
+        keys = np.fromiter((key for key, _ in items), dtype=np.float64, count=len(items))
+        col_arr = np.empty((len(items), 4))
+        for i, (_, col) in enumerate(items):
+            col_arr[i] = get_single_color(col).toTuple()
+        colors = np.empty((N_points, 4))
+        interp_colors = get_numba_func("interp_colors")
+        if interp_colors is not None:
+            interp_colors(positions, keys, col_arr, colors)     # interpolates all channels in a single loop
+        else:
+            for i in range(4):
+                colors[:, i] = np.interp(positions, keys, col_arr[:, i])
     else:
-        for i in range(N_points):
-            colors[i] = cmap(i / (N_points - 1))
+        colors = call_cmap(cmap, positions)     # all colors in a single call, if cmap accepts arrays
 
     return colors
 
@@ -1,15 +1,18 @@
 import ast
 import os.path
 import json
+import warnings
 from argparse import ArgumentError
 from typing import TypeAlias, Union, Tuple, Iterable
+from functools import cache
+from inspect import signature, isfunction, CO_VARARGS, CO_VARKEYWORDS
 
 import numpy as np
 from numbers import Number
 from PySide6.QtGui import QGradient, Qt, QFont, QColor, QPen
 
 from PySide6.QtWidgets import QTableWidgetItem
-from pyqtgraph import mkPen, mkColor, colormap
+from pyqtgraph import mkPen, mkColor, colormap, getConfigOption, setConfigOption
 
 
 ColorType: TypeAlias = Union[QColor, mkColor, str, Iterable[int], float]
@@ -196,14 +199,13 @@ def get_cmap(data: str | dict[float | int, ColorType] | Iterable[ColorType], sou
     if callable(data):  # probably catches too much, todo: check
         return data
 
+    if isinstance(data, str):
+        return get_named_cmap(data, source)
+
     if isinstance(data, list):  # turns data into dict with equal spacing
         data = {index / (len(data) - 1): np.array(get_single_color(col).toTuple()) for index, col in enumerate(data)}
 
-    if isinstance(data, str):
-        def cmap_func(i):
-            return colormap.get(data, source).map(i)
-
-    elif isinstance(data, dict):
+    if isinstance(data, dict):
         for key, value in data.items():
             data[key] = np.array(get_single_color(value).toTuple())
         keys, values = map(np.array, zip(*sorted(data.items())))
@@ -255,29 +257,135 @@ def get_cmap(data: str | dict[float | int, ColorType] | Iterable[ColorType], sou
         raise TypeError("cmap is of incorrect type. Must be str, list or dict.")
 
     cmap_func.data = data
+    cmap_func.stops = (keys.astype(np.float64), values.astype(np.float64))     # used by the numba image path
 
     return cmap_func
 
 
+@cache
+def get_named_cmap(name: str, source: str = "matplotlib"):
+    """Cmap function for the cmap called `name` from library `source`. The colormap is only loaded the first time a name
+    is requested, after that the same cmap function is returned. """
+    pg_cmap = colormap.get(name, source)
+
+    def cmap_func(i):
+        return pg_cmap.map(i)
+
+    cmap_func.data = name
+    cmap_func.source = source
+    positions, colors = pg_cmap.getStops(mode=pg_cmap.BYTE)
+    cmap_func.stops = (np.asarray(positions, dtype=np.float64), np.asarray(colors, dtype=np.float64))
+    return cmap_func
+
+
+@cache
+def get_stop_positions(resolution: int) -> np.ndarray:
+    """`resolution` evenly spaced positions from 0 to 1, shared by all gradients with the same resolution. """
+    positions = np.linspace(0, 1, resolution)
+    positions.setflags(write=False)     # shared, so it must not be changed
+    return positions
+
+
+def call_cmap(cmap, positions: np.ndarray) -> np.ndarray:
+    """The colors of cmap function `cmap` at `positions`, as an (N, 4) float array. All positions are passed in a single
+    call when `cmap` accepts an array, otherwise `cmap` is called once for each position. """
+    try:
+        colors = np.asarray(cmap(positions), dtype=np.float64)
+    except Exception:       # a function written for scalars, any real error is raised again by the calls below
+        colors = None
+    if colors is None or colors.shape != (len(positions), 4):
+        colors = np.array([cmap(pos) for pos in positions.tolist()], dtype=np.float64)
+    return colors
+
+
+@cache
+def get_named_stops(name: str, source: str, resolution: int) -> tuple:
+    """The LUT (uint8 array of RGBA values) and gradient stops of the named cmap `name` at `resolution`. Gradients with
+    the same cmap and resolution share these, so they are only computed for the first one. """
+    positions = get_stop_positions(resolution)
+    lut = np.asarray(get_named_cmap(name, source)(positions), dtype=np.uint8)
+    lut.setflags(write=False)   # shared, so it must not be changed
+    stops = tuple((pos, QColor(*color)) for pos, color in zip(positions.tolist(), lut.tolist()))
+    return lut, stops
+
+
+def get_callable_stops(cmap, resolution: int) -> tuple:
+    """The same as `get_named_stops`, for a cmap that is a function, eg. a matplotlib Colormap. Not cached, because a
+    cache would keep every cmap function passed to it alive; `cmap_to_gradient` only calls this once per gradient.
+
+    The colors of `cmap` can be from 0 to 1 like matplotlib, or from 0 to 255 like squap's own cmaps. When none of
+    them are above 1, they are taken to be from 0 to 1.
+    """
+    positions = get_stop_positions(resolution)
+    if hasattr(cmap, "N"):      # matplotlib Colormap, which returns values from 0 to 1 unless bytes is set
+        lut = np.asarray(cmap(positions, bytes=True), dtype=np.uint8)
+    else:
+        colors = call_cmap(cmap, positions)
+        if colors.max() <= 1:
+            colors = colors * 255
+        lut = np.rint(np.clip(colors, 0, 255)).astype(np.uint8)
+    stops = tuple((pos, QColor(*color)) for pos, color in zip(positions.tolist(), lut.tolist()))
+    return lut, stops
+
+
 def cmap_to_gradient(cmap, gradient):
     """
     cmap must be from get_cmap, or accepted by get_cmap, and the gradient must be from get_gradient
+
+    The stops of a gradient only depend on its cmap and resolution, so they are only set the first time. For a named
+    cmap or a cmap function, the colors and stops come from `get_named_stops` or `get_callable_stops`, and the first
+    shares them between gradients. The colors are stored as `gradient.lut` (uint8 array of RGBA values).
     """
+    if getattr(gradient, "lut", None) is not None:     # gradients not made by get_gradient have no lut
+        return gradient
+
     cmap = get_cmap(cmap)
-    if isinstance(cmap.data, str):
-        for i in range(gradient.resolution):
-            value = cmap(i / (gradient.resolution - 1))
-            gradient.setColorAt(i / (gradient.resolution - 1), get_single_color(value))
+    data = getattr(cmap, "data", None)      # functions passed by the user have no data
+    if isinstance(data, str):
+        gradient.lut, stops = get_named_stops(data, cmap.source, gradient.resolution)
+        gradient.setStops(list(stops))
+    elif data is None:
+        gradient.lut, stops = get_callable_stops(cmap, gradient.resolution)
+        gradient.setStops(list(stops))
     else:
-        for key, value in cmap.data.items():
-            gradient.setColorAt(key, get_single_color(value))
+        stops = sorted(((key, get_single_color(value)) for key, value in cmap.data.items()), key=lambda stop: stop[0])
+        gradient.lut = np.array([color.toTuple() for _, color in stops], dtype=np.uint8)
+        gradient.setStops(stops)
     return gradient
 
 
+def get_numba_func(name: str):
+    """The function `name` from numba_funcs when numba is enabled, otherwise None. If numba can't be imported, a warning
+    is given and numba is disabled, so that numpy is used from then on. """
+    if not getConfigOption('useNumba'):
+        return None
+    try:
+        from . import numba_funcs
+    except ImportError:
+        warnings.warn("numba is enabled, but it could not be imported. Using numpy instead.")
+        setConfigOption('useNumba', False)      # pyqtgraph would also fail to import numba
+        return None
+    return getattr(numba_funcs, name)
+
+
 def qvect_to_arr(qvect):    # turns any type of QVector into an array
     return np.array(qvect.toTuple())
 
 
+def count_params(func) -> tuple[int, bool]:
+    """The number of parameters of `func`, and whether it takes *args. For plain functions, this is read from the code
+    object, which is much faster than `inspect.signature`. """
+    if not isfunction(func) or hasattr(func, "__wrapped__"):    # eg. bound methods, builtins and decorated functions
+        params = signature(func).parameters
+        has_var_args = any(param.kind == param.VAR_POSITIONAL for param in params.values())
+        return len(params), has_var_args
+
+    code = func.__code__
+    has_var_args = bool(code.co_flags & CO_VARARGS)
+    has_var_kwargs = bool(code.co_flags & CO_VARKEYWORDS)
+    return code.co_argcount + code.co_kwonlyargcount + has_var_args + has_var_kwargs, has_var_args
+
+
 def textify(value):         # consistent value layout. If it is too large or small, it will be represented in e notation
     if 0.001 < value <= 1e5:
         text = str(round(value, 12))
@@ -306,6 +414,17 @@ def is_multiple_colors(arg):
 
 
 def get_single_color(input_col):
+    if isinstance(input_col, (str, tuple)):     # hashable, so the parsed color can be reused
+        return QColor(get_cached_color(input_col))      # copy, so that the cached color can not be changed
+    return make_single_color(input_col)
+
+
+@cache
+def get_cached_color(input_col):
+    return make_single_color(input_col)
+
+
+def make_single_color(input_col):
     if is_iter(input_col):
         if isinstance(input_col[0], Number):
             if len(input_col) == 3 or len(input_col) == 4:
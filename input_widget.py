@@ -152,7 +152,7 @@ class InputTable(QTableWidget):    # table for all inputs
         """
         Returns a list containing all boxes that exist at this point.
         """
-        return [box_row[-1] for box_row in self.boxes]
+        return [box_row[-1] for box_row in self.boxes if box_row]     # empty rows are ()
 
     def add_widget(self, row, box_row):     # if row is specified and row is in empty_rows it is added there
         if row is None or row == self.current_row+1:
@@ -434,31 +434,7 @@ class InputTable(QTableWidget):    # table for all inputs
 
             self.current_name = var_name
 
-            if custom_arr is not None:
-                self.arr = custom_arr
-            elif logscale:
-                if min_value*max_value <= 0:
-                    raise ValueError("`min_value` and `max_value` must have the same sign when `logscale` is enabled.")
-                if not tick_interval:
-                    self.arr = np.logspace(np.log10(min_value), np.log10(max_value), int(n_ticks))
-                else:
-                    n_ticks = round(np.emath.logn(tick_interval, max_value/min_value))
-                    self.arr = np.logspace(np.log10(min_value), np.log10(max_value), n_ticks)
-                if only_ints:
-                    self.arr = np.round(self.arr).astype(int)
-            elif only_ints:
-                if tick_interval is None:
-                    tick_interval = 1
-                else:
-                    tick_interval = int(tick_interval)
-                # max_value = max_value - (max_value - min_value) % tick_interval
-                self.arr = np.arange(min_value, max_value+tick_interval, tick_interval)
-                # n = int((max_value - min_value) / tick_interval)
-            else:
-                if not tick_interval:
-                    self.arr = np.linspace(min_value, max_value, int(n_ticks))
-                else:
-                    self.arr = np.arange(min_value, max_value+tick_interval, tick_interval)
+            self.make_arr(n_ticks)
 
             # slider.setStyleSheet("QSlider {height: 20px; width: 200px;}")     # makes sliders nicer
             n = len(self.arr)-1
@@ -520,38 +496,15 @@ class InputTable(QTableWidget):    # table for all inputs
                 if "custom_arr" not in kwargs:      # if custom_arr is not provided but other arguments that change self.arr are
                     self.custom_arr = None
 
-                if self.custom_arr is not None:
-                    self.arr = self.custom_arr
-                elif self.logscale:
-                    if self.min_value * self.max_value <= 0:
-                        raise ValueError("min_value and max_value must have the same sign when logscale is enabled.")
-                    if not self.tick_interval:
-                        self.arr = np.logspace(np.log10(self.min_value), np.log10(self.max_value), self.n_ticks)
-                    else:
-                        n_ticks = round(np.emath.logn(self.tick_interval, self.max_value / self.min_value))
-                        self.arr = np.logspace(np.log10(self.min_value), np.log10(self.max_value), n_ticks)
-                elif self.only_ints:
-                    if self.tick_interval is None:
-                        tick_interval = 1
-                    else:
-                        tick_interval = int(self.tick_interval)
-
-                    self.arr = np.arange(self.min_value, self.max_value + tick_interval, tick_interval)
-                    # self.max_value = self.max_value - (self.max_value-self.min_value) % tick_interval
-                    # n = int((self.max_value-self.min_value)/tick_interval)
+                if self.tick_interval is None and "n_ticks" not in kwargs and not self.logscale:
+                    n_ticks = len(self.arr)     # keeps the current number of ticks, a logscale always uses n_ticks
                 else:
-                    # print(not float(self.tick_i?nterval))
-                    if self.tick_interval is None:
-                        if "n_ticks" in kwargs.keys():
-                            n_ticks = int(kwargs["n_ticks"])
-                        else:
-                            n_ticks = len(self.arr)
-                        self.arr = np.linspace(self.min_value, self.max_value, n_ticks)
-                    else:
-                        self.arr = np.arange(self.min_value, self.max_value+self.tick_interval, self.tick_interval)
+                    n_ticks = self.n_ticks
+                self.make_arr(n_ticks)
 
                 if len(self.arr) == 0:
                     self.arr = old_arr
+                    self.search_arr = None
                     raise ValueError("Current parameters give an empty array")
 
                 n = len(self.arr) - 1
@@ -562,12 +515,7 @@ class InputTable(QTableWidget):    # table for all inputs
                     self.setTickPosition(QSlider.TickPosition.TicksBelow)
 
                 current_val = getattr(self.parent.variables, self.current_name)
-                if self.logscale:
-                    slider_val = np.argmin(np.abs(np.log10(np.array(self.arr)) - np.log10(current_val)))
-                else:
-                    slider_val = np.argmin(np.abs(np.array(self.arr) - current_val))
-
-                self.setValue(slider_val)       # also automatically calls on_change
+                self.setValue(self.closest_index(current_val))       # also automatically calls on_change
 
             if turn_on_print_func:
                 self.valueChanged.connect(self.print_val)
@@ -577,6 +525,43 @@ class InputTable(QTableWidget):    # table for all inputs
                     self.valueChanged.disconnect(func)
                     self.valueChanged.connect(func)
 
+        def make_arr(self, n_ticks):
+            """Set `self.arr`, the value at each position of the slider, from the parameters of the slider. """
+            if self.custom_arr is not None:
+                self.arr = self.custom_arr
+            elif self.logscale:
+                if self.min_value * self.max_value <= 0:
+                    raise ValueError("`min_value` and `max_value` must have the same sign when `logscale` is enabled.")
+                if self.tick_interval:
+                    n_ticks = round(np.emath.logn(self.tick_interval, self.max_value / self.min_value))
+                self.arr = np.geomspace(self.min_value, self.max_value, int(n_ticks))
+                if self.only_ints:
+                    self.arr = np.round(self.arr).astype(int)
+            elif self.only_ints:
+                if self.tick_interval is None:
+                    tick_interval = 1
+                else:
+                    tick_interval = int(self.tick_interval)
+                # max_value = max_value - (max_value - min_value) % tick_interval
+                self.arr = np.arange(self.min_value, self.max_value + tick_interval, tick_interval)
+                # n = int((max_value - min_value) / tick_interval)
+            elif self.tick_interval:
+                self.arr = np.arange(self.min_value, self.max_value + self.tick_interval, self.tick_interval)
+            else:
+                self.arr = np.linspace(self.min_value, self.max_value, int(n_ticks))
+            self.search_arr = None      # computed by closest_index when it is first needed
+
+        def closest_index(self, value):
+            """Index of the value in `self.arr` closest to `value` (closest in log space with `logscale`). """
+            if self.search_arr is None:
+                if self.logscale:
+                    self.search_arr = np.log10(np.abs(np.array(self.arr)))
+                else:
+                    self.search_arr = np.array(self.arr)
+            if self.logscale:
+                return np.argmin(np.abs(self.search_arr - np.log10(abs(value))))
+            return np.argmin(np.abs(self.search_arr - value))
+
         def bind(self, func):
             self.change_funcs.append(func)
             self.valueChanged.connect(func)
@@ -594,10 +579,7 @@ class InputTable(QTableWidget):    # table for all inputs
             setattr(self.parent.variables, self.current_name, self.arr[val])
 
         def set_value(self, value):
-            if self.logscale:
-                slider_val = np.argmin(np.abs(np.log10(np.array(self.arr)) - np.log10(value)))
-            else:
-                slider_val = np.argmin(np.abs(np.array(self.arr) - value))
+            slider_val = self.closest_index(value)
             setattr(self.parent.variables, self.current_name, value)
             self.valueChanged.disconnect(self.on_change)        # so that `var.current_name` is set to `value` not
             # the closest possible value in `self.arr`.
@@ -1201,7 +1183,7 @@ class InputTable(QTableWidget):    # table for all inputs
                     parent.setItem(self.row, self.col, QTableWidgetItem(textify(val)))
             # </editor-fold>
 
-            self.parent.update_funcs.append(update_func)
+            self.parent.window.on_refresh(update_func)
 
             if print_value:
                 def print_func(row, col):
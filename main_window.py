@@ -1,26 +1,26 @@
 import sys
 import os.path
-from time import perf_counter as current_time
-import time
+import signal
+import threading
+from time import perf_counter_ns as current_time     # in integer nanoseconds
 from argparse import Namespace
 
-import cv2
-import numpy as np
-
 from typing import Callable
 from numbers import Number
-from inspect import signature
+from math import floor, log10
 from argparse import ArgumentError
 
 from PySide6.QtWidgets import QMainWindow, QSplitter, QWidget, QApplication
 from PySide6.QtGui import QCursor, QGuiApplication
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import QTimer, QEventLoop
 from PySide6.QtCore import Qt
 
 from .plot_manager import PlotManager
 from .table_manager import TableManager
 from .plot_widget import PlotWidget
 from .input_widget import InputTable
+from .video_writer import VideoWriter
+from .helper_funcs import count_params
 # from .plot_widget_3d import PlotWidget3D
 
 
@@ -33,15 +33,21 @@ class MainWindow(QMainWindow):
 
         self.variables = variables
         self.update_funcs = []
+        self.fused_update_func = None       # calls all update_funcs, see get_update_func
+        self.update_funcs_changed = True    # set when update_funcs changes, so fused_update_func is regenerated
 
         self.plot_manager = PlotManager()
         self.setCentralWidget(self.plot_manager.fig_widget)
+        self.mouse_pos = None               # last position of the mouse on fig_widget, see get_mouse_pos
+        self.plot_manager.fig_widget.scene().sigMouseMoved.connect(self.store_mouse_pos)
 
         self.table_manager = TableManager(height)
 
         self.interval = None                # for timer when animated
-        self.fps_timer = None
+        self.interval_ns = None             # the same interval in nanoseconds, to compare with current_time
         self.refresh_timer = None
+        self.wait_loop = None               # event loop that refresh waits in, created the first time it waits
+        self.wait_timer = None              # precise single shot timer that ends the wait, reused every refresh
         self.timer = None                   # for disconnecting update_funcs
 
         self.resized = False                # if it has been resized already, the input_widget mustn't make it bigger
@@ -153,6 +159,7 @@ class MainWindow(QMainWindow):
             interval (Number): The time interval (in seconds) to set for updating the plot.
         """
         self.interval = interval * 1000
+        self.interval_ns = int(interval * 1e9)
         if self.is_alive():
             self.timer.setTimeout(self.interval)        # not tested
 
@@ -170,14 +177,30 @@ class MainWindow(QMainWindow):
                 Defaults to False.
         """
         if not disconnect:
-            if self.timer:
-                self.timer.timeout.connect(func)
             self.update_funcs.append(func)
-        else:
-            if func in self.update_funcs:
-                self.update_funcs.append(func)
-                if self.timer:
-                    self.timer.timeout.disconnect(func)
+        elif func in self.update_funcs:     # the timer calls update_funcs through call_update_funcs, so only the list
+            self.update_funcs.remove(func)  # has to be changed
+        self.update_funcs_changed = True
+
+    def get_update_func(self) -> Callable:
+        """Return a single function that calls every function in `update_funcs`.
+
+        The function is generated with the calls written out one by one, so calling it is cheaper than looping over
+        `update_funcs`. It is only regenerated when `update_funcs` has changed since the last time, so `update_funcs` must
+        only be changed through `on_refresh` or `clear`.
+        """
+        if self.update_funcs_changed:
+            funcs = tuple(self.update_funcs)
+            namespace = {f"func_{i}": func for i, func in enumerate(funcs)}
+            source = "def fused_update_func():\n" + "".join(f"    func_{i}()\n" for i in range(len(funcs))) + "    return\n"
+            exec(source, namespace)
+            self.fused_update_func = namespace["fused_update_func"]
+            self.update_funcs_changed = False
+        return self.fused_update_func
+
+    def call_update_funcs(self):
+        """The only slot connected to the timer of `start`, calls the functions that are in `update_funcs` right now. """
+        self.get_update_func()()
 
     def benchmark(self, n_frames: int | None = None, duration: float | None = None):
         """Run the program until it is closed and then report the total frames and fps.
@@ -191,34 +214,29 @@ class MainWindow(QMainWindow):
         local_vars = Namespace(time=current_time(), count=0)
         # Namespace used for function variables that need to carry over
 
-        if n_frames is None and duration is None:
-            def func():
-                local_vars.count += 1
-
-        elif n_frames is None:
-            def func():
-                local_vars.count += 1
-                if current_time() - local_vars.time > duration:
+        if duration is not None:       # closing after `duration` is left to Qt, so func doesn't need to read the clock
+            def close_after_duration():
+                if self.isVisible():    # it may already be closed after n_frames
                     self.close()
 
-        elif duration is None:
+            QTimer.singleShot(int(duration * 1000), close_after_duration)
+
+        if n_frames is None:
             def func():
                 local_vars.count += 1
-                if local_vars.count >= n_frames:
-                    self.close()
 
         else:
             def func():
                 local_vars.count += 1
-                if current_time() - local_vars.time > duration or local_vars.count >= n_frames:
+                if local_vars.count >= n_frames:
                     self.close()
 
         def final_func():
-            elapsed = current_time() - local_vars.time
+            elapsed = (current_time() - local_vars.time) / 1e9
             print(f"{local_vars.count} frames have passed in {elapsed} seconds, "
                   f"which gives an fps of {local_vars.count / elapsed}")
 
-        self.update_funcs.append(func)
+        self.on_refresh(func)
         self.close_funcs.append(final_func)
 
     def resize_window(self, width: int, height: int):
@@ -273,61 +291,65 @@ class MainWindow(QMainWindow):
                 this function is called.
         """
         if wait_interval and self.interval:
-            now = current_time()
-            to_wait = self.interval / 1000 - (now - self.refresh_timer)
-            if to_wait > 0:
-                time.sleep(to_wait)
+            deadline = self.refresh_timer + self.interval_ns
+            to_wait = deadline - current_time()
+            while to_wait > 0:      # wait in an event loop instead of time.sleep, so that input is handled meanwhile
+                if self.wait_loop is None:
+                    self.wait_loop = QEventLoop()
+                    self.wait_timer = QTimer()
+                    self.wait_timer.setSingleShot(True)
+                    self.wait_timer.setTimerType(Qt.PreciseTimer)
+                    self.wait_timer.timeout.connect(self.wait_loop.quit)
+                self.wait_timer.start(-(-to_wait // 1_000_000))     # whole ms, rounded up so it doesn't end too early
+                self.wait_loop.exec()
+                to_wait = deadline - current_time()     # waits again if the timer ended early anyway
             self.refresh_timer = current_time()
             QGuiApplication.processEvents()
         else:
             QGuiApplication.processEvents()
         if call_update_funcs:
-            for func in self.update_funcs:
-                func()
+            self.get_update_func()()
         # timer.start(0)
 
-    def show_window(self):
-        """Shows the window and refreshes it. Use in combination with `squap.refresh`"""
-        self.refresh_timer = current_time()
+    def set_splitter_sizes(self):
+        """Divide the width of the window between the input widget and the plots, before the window is shown. Updates
+        are disabled meanwhile, so that the layout is only done once. """
+        if not self.table_manager.main_input_widget:
+            return
 
-        if self.table_manager.main_input_widget:
+        self.setUpdatesEnabled(False)
+        try:
+            width, height = self.size().toTuple()
             if self.resized:
                 if not self.table_manager.resized:
                     x = self.splitter.width_ratio  # calculates width of the input_widget given x and total w
-                    fig_width = self.size().width() / (1 + x)
+                    fig_width = width / (1 + x)
                     self.table_manager.width = fig_width * x
                 else:
-                    fig_width = self.width() - self.table_manager.width - 4
-                self.splitter.setSizes([self.table_manager.width, fig_width])
+                    fig_width = width - self.table_manager.width - 4
             else:
                 if not self.table_manager.resized:
-                    self.resize(self.size().width() + self.table_manager.width + 4, self.height())
+                    self.resize(width + self.table_manager.width + 4, height)
                 # +4 extra for space between plot_widget and input_widget
-                self.splitter.setSizes([self.table_manager.width, self.plot_manager.fig_widget.width()])
-
-        self.show()
+                fig_width = self.plot_manager.fig_widget.width()
+            self.splitter.setSizes([int(self.table_manager.width), int(fig_width)])
+        finally:
+            self.setUpdatesEnabled(True)
 
-        self.refresh()
-        if self.interval:
-            self.variables.hidden_variables["start"] = time.time()
+    def show_window(self):
+        """Shows the window and refreshes it. Use in combination with `squap.refresh`"""
+        self.refresh_timer = current_time()
 
-            def interval_func():
-                time_left = self.interval / 1000 - (time.time() - self.variables.hidden_variables["start"])
-                print(f"{time_left = }")
-                # the time it should still wait
-                if time_left > 0:
-                    time.sleep(time_left)
-                self.variables.hidden_variables["start"] = time.time()
+        self.set_splitter_sizes()
+        self.show()
 
-            self.update_funcs.append(interval_func)
+        self.refresh()      # refresh waits for the interval itself
 
     def start(self):
         """Show window and starts loop. Use in combination with `Box.bind`, `squap.on_refresh` or for static plots. """
 
         timer = QTimer()  # timer is required for running functions on refresh and executing pyqtgraph programs
-        if len(self.update_funcs):
-            for func in self.update_funcs:
-                timer.timeout.connect(func)
+        timer.timeout.connect(self.call_update_funcs)   # one slot that calls all update_funcs
 
         if self.interval:
             timer.start(self.interval)
@@ -335,23 +357,9 @@ class MainWindow(QMainWindow):
             timer.start()
         self.timer = timer
 
-        if self.table_manager.main_input_widget:
-            if self.resized:
-                if not self.table_manager.resized:
-                    x = self.splitter.width_ratio  # calculates width of the input_widget given x and total w
-                    fig_width = self.size().width() / (1 + x)
-                    self.table_manager.width = fig_width * x
-                else:
-                    fig_width = self.width() - self.table_manager.width - 4
-                self.splitter.setSizes([self.table_manager.width, fig_width])
-            else:
-                if not self.table_manager.resized:
-                    self.resize(self.size().width() + self.table_manager.width + 4, self.height())
-                # +4 extra for space between plot_widget and input_widget
-                self.splitter.setSizes([self.table_manager.width, self.plot_manager.fig_widget.width()])
-
-            # pos = window.pos().toTuple()          # don't know why but this is suddenly not necessary anymore
-            # window.move(pos[0]-0.5*(window.input_widget.width() + 4), pos[1])
+        self.set_splitter_sizes()
+        # pos = window.pos().toTuple()          # don't know why but this is suddenly not necessary anymore
+        # window.move(pos[0]-0.5*(window.input_widget.width() + 4), pos[1])
 
         self.show()
 
@@ -359,10 +367,8 @@ class MainWindow(QMainWindow):
 
     def clear(self):
         """Clear everything. Todo: check"""
-        for update_func in self.update_funcs:
-            self.timer.timeout.disconnect(update_func)
-
-        self.update_funcs = []
+        self.update_funcs.clear()       # the timer keeps calling call_update_funcs, which now calls nothing
+        self.update_funcs_changed = True
         self.plot_manager.clear()
 
     def export(self, filename: str, widget: QWidget | None = None):
@@ -380,9 +386,9 @@ class MainWindow(QMainWindow):
 
         basename, extension = os.path.splitext(filename)
         if extension:
-            success = pixmap.toImage().save(filename)
+            success = pixmap.save(filename)     # saves without first making a separate QImage
         else:
-            success = pixmap.toImage().save(f"{filename}.png")
+            success = pixmap.save(f"{filename}.png")
             extension = ".png"
         if success:
             print(f"Exported current plot window to {basename}{extension}")
@@ -392,7 +398,7 @@ class MainWindow(QMainWindow):
     def export_video(
             self, filename: str, fps: float | int = 30.0, n_frames: int | None = None, duration: float | None = None,
             stop_func: Callable | None = None, skip_frames: int = 0, display_window: bool = False,
-            widget: QWidget | None = None, save_on_close: bool = True
+            widget: QWidget | None = None, save_on_close: bool = True, gpu_encode: bool = False
     ):
         """Saves a video to file `filename` with the specified parameters.
 
@@ -414,6 +420,8 @@ class MainWindow(QMainWindow):
             widget (QWidget, optional): which widget to record. Can be eg. a single plot, the entire window, or only
                 the plot window. Defaults to only the plot window.
             save_on_close (bool, optional): Whether to save the video if the window is closed prematurely. Defaults to True.
+            gpu_encode (bool, optional): Whether to encode the video on an NVIDIA GPU (NVENC). Only works when ffmpeg is
+                installed with NVENC support, otherwise the video is encoded on the CPU. Defaults to False.
         """
         if widget is None:
             widget = self
@@ -421,82 +429,64 @@ class MainWindow(QMainWindow):
         if len([None for arg in [n_frames, duration, stop_func] if arg is None]) < 2:
             raise ValueError("Only one of n_frames, duration or stop_func can be provided, error code 1009.")
 
-        # this bit creates the loop condition, which can be the stop_func given by the user, or
+        # the loop stops after n_frames frames, or when stop_func returns True. These are checked in the loop itself
+        # instead of through a separate condition function, which would be an extra call every frame.
         if duration is not None:
             n_frames = int(duration * fps)
-        if stop_func is not None:
-            def condition():
-                return stop_func()
-        elif n_frames is None:
-            def condition():
-                return False
+        if n_frames is None:
+            n_frames = -1             # never reached, so the loop only stops because of stop_func or an interrupt
         else:
             n_frames = int(n_frames)  # shouldn't do anything, but just incase it prevents an infinite loop
 
-            def condition():
-                return frame_counter == n_frames
-
         frame_counter = 0
-        pixmaps = []
+        next_saved_frame = 0                    # a frame is saved every `skip_frames + 1` frames
+        writer = VideoWriter(filename, fps, gpu_encode=gpu_encode)     # frames are written to the file while recording
         if display_window:
             self.show_window()
 
+        # Ctrl+C only sets a flag, so that the recording stops after a complete frame instead of halfway through an
+        # update function, and the frames so far can still be saved.
+        interrupt = Namespace(received=False)
+
+        def on_interrupt(signum, frame):
+            interrupt.received = True
+
+        on_main_thread = threading.current_thread() is threading.main_thread()
+        if on_main_thread:      # signal handlers can only be set from the main thread
+            previous_handler = signal.signal(signal.SIGINT, on_interrupt)
         try:
-            while not condition():
-                for update_func in self.update_funcs:
-                    update_func()
+            while frame_counter != n_frames and not interrupt.received:
+                if stop_func is not None and stop_func():
+                    break
+                self.get_update_func()()
 
                 if display_window:
-                    self.refresh()
+                    self.refresh(call_update_funcs=False)   # they have just been called
 
-                if not frame_counter % (skip_frames + 1):
-                    pixmaps.append(widget.grab())
+                if frame_counter == next_saved_frame:
+                    writer.add_frame(widget)
+                    next_saved_frame += skip_frames + 1
 
                 frame_counter += 1
-
-        except KeyboardInterrupt:
+        except BaseException:
+            writer.discard()        # stops the background thread and ffmpeg, the video is incomplete
+            raise
+        finally:
+            if on_main_thread:
+                signal.signal(signal.SIGINT, previous_handler)
+
+        if interrupt.received:
             if save_on_close:
                 print("The program is interupted, the recording is now being save.")
             else:
                 print("The program is interupted, the video will not be saved.")
+                writer.discard()
                 return
 
-        basename, extension = os.path.splitext(filename)
-        print(f"started saving {len(pixmaps)} frames to file {basename}.mp4 at {fps} fps")  # maybe other file-extension
-        if extension and extension != '.mp4':
-            print("you can only save to mp4, if you want other filenames, you can request them")
-
-        arrs = []
-
-        for index, pixmap in enumerate(pixmaps):  # see chatgpt once it works again
-            qimg = pixmap.toImage()
-
-            img_size = qimg.size()
-            buffer = qimg.constBits()
-
-            arr = np.ndarray(
-                shape=(img_size.height(), img_size.width(), qimg.depth() // 8),
-                buffer=buffer,
-                dtype=np.uint8
-            )
-            arrs.append(arr[:, :, :3])  # only include RGB, not A
-
-        try:
-            width, height, _ = arr.shape
-        except NameError:
-            raise NameError("No frames were captured, error code 1006.")
-        out = cv2.VideoWriter(f"{basename}.mp4", cv2.VideoWriter_fourcc(*'mp4v'), fps, (height, width))
-
-        for index, arr in enumerate(arrs):
-            out.write(arr)
-            if not (index % 1000) and index:
-                print(f"{index} frames have been saved.")
-
-        out.release()
-        print("Saving finished.")
+        writer.release()
 
     def start_recording(self, filename: str, fps: Number = 30.0, skip_frames: int = 0,
-                        widget: QWidget | None = None) -> Callable:
+                        widget: QWidget | None = None, gpu_encode: bool = False) -> Callable:
         """Start recording to file `filename` with the specified parameters. Use function returned by this function to stop
         the recording.
 
@@ -505,6 +495,8 @@ class MainWindow(QMainWindow):
             fps (Number, optional): Frames per second of the video. Defaults to 30.
             widget (QWidget, optional): which widget to record. Can be eg. a single plot, the entire window, or only
                 the plot window. Defaults to only the plot window.
+            gpu_encode (bool, optional): Whether to encode the video on an NVIDIA GPU (NVENC). Only works when ffmpeg is
+                installed with NVENC support, otherwise the video is encoded on the CPU. Defaults to False.
 
         Returns:
             Callable: Call this function to stop the recording and save the video.
@@ -512,53 +504,24 @@ class MainWindow(QMainWindow):
         if widget is None:
             widget = self
 
-        pixmaps = []
-        frame_counter = {"i": 0}
+        writer = VideoWriter(filename, fps, gpu_encode=gpu_encode)     # frames are written to the file while recording
+        frames = Namespace(count=0, next_saved=0, stopped=False)   # a frame is saved every `skip_frames + 1` frames
+        stride = skip_frames + 1
 
         def record_func():
-            if not frame_counter["i"] % (skip_frames + 1):
-                pixmaps.append(widget.grab())
-            frame_counter["i"] += 1
+            if frames.count == frames.next_saved:
+                writer.add_frame(widget)
+                frames.next_saved += stride
+            frames.count += 1
 
         def stop_func():
-            basename, extension = os.path.splitext(filename)
-            print(
-                f"started saving {len(pixmaps)} frames to file {basename}.mp4 at {fps} fps")  # maybe other file-extension
-            if extension and extension != '.mp4':
-                print("you can only save to mp4, if you want other filenames, you can request them")
-
-            arrs = []
-
-            for index, pixmap in enumerate(pixmaps):  # see chatgpt once it works again
-                qimg = pixmap.toImage()
-
-                img_size = qimg.size()
-                buffer = qimg.constBits()
-
-                arr = np.ndarray(
-                    shape=(img_size.height(), img_size.width(), qimg.depth() // 8),
-                    buffer=buffer,
-                    dtype=np.uint8
-                )
-                arrs.append(arr[:, :, :3])  # only include RGB, not A
-
-            try:
-                width, height, _ = arr.shape
-            except NameError:
-                raise NameError("No frames were captured, error code 1006.")
-            out = cv2.VideoWriter(f"{basename}.mp4", cv2.VideoWriter_fourcc(*'mp4v'), fps, (height, width))
-
-            for index, arr in enumerate(arrs):
-                out.write(arr)
-                if not (index % 1000) and index:
-                    print(f"{index} frames have been saved.")
-
-            out.release()
-            print("Saving finished.")
-
-            self.update_funcs.remove(record_func)
+            if frames.stopped:      # calling it again does nothing
+                return
+            frames.stopped = True
+            self.on_refresh(record_func, disconnect=True)   # first, so that recording stops even if release raises
+            writer.release()
 
-        self.update_funcs.append(record_func)
+        self.on_refresh(record_func)
 
         return stop_func
 
@@ -585,25 +548,27 @@ class MainWindow(QMainWindow):
         if ax is None:
             ax = self.plot_manager.plot_widget
 
-        self.fps_timer = current_time()
-        skip = Namespace(total=0, count=0)  # Namespace used for function variables that need to carry over
-        # the fps is updated
+        skip = Namespace(total=0, count=0, time=current_time())  # Namespace used for function variables that need to
+        # carry over. Everything func uses is kept in locals, as attributes of Qt objects like self are slow to look up
+        plot_manager, variables, set_title = self.plot_manager, self.variables, ax.set_title
+
+        update_speed_ns = update_speed * 1e9
 
         if optimized:
             def func():
                 if skip.count == 0:
                     now = current_time()
-                    elapsed = now - self.fps_timer
+                    elapsed = now - skip.time
                     if elapsed:
-                        self.fps_timer = now
-                        fps = (skip.total + 1) / elapsed
-                        fps = round(fps, -int(np.floor(np.log10(fps))) + (5 - 1))
+                        skip.time = now
+                        fps = (skip.total + 1) * 1e9 / elapsed
+                        fps = round(fps, (5 - 1) - floor(log10(fps)))     # 5 significant digits
                         if get_fps:
-                            setattr(self.variables, "fps", fps)
-                        if self.plot_manager.plot_style_3D:
+                            variables.fps = fps
+                        if plot_manager.plot_style_3D:
                             print(f"{fps = }")
                         else:
-                            ax.set_title(f"fps = {fps}")
+                            set_title(f"fps = {fps}")
 
                         skip.total = int(update_speed * fps)
                         skip.count = skip.total
@@ -611,19 +576,22 @@ class MainWindow(QMainWindow):
                     skip.count -= 1
         else:
             def func():
-                elapsed = current_time() - self.fps_timer
+                now = current_time()
+                elapsed = now - skip.time
                 skip.count += 1
-                if elapsed > update_speed:
-                    self.fps_timer = current_time()
-                    fps = skip.count / elapsed
-                    fps = round(fps, -int(np.floor(np.log10(fps))) + (5 - 1))
-                    if self.plot_manager.plot_style_3D:
+                if elapsed > update_speed_ns:
+                    skip.time = now
+                    fps = skip.count * 1e9 / elapsed
+                    fps = round(fps, (5 - 1) - floor(log10(fps)))     # 5 significant digits
+                    if get_fps:
+                        variables.fps = fps
+                    if plot_manager.plot_style_3D:
                         print(f"{fps = }")
                     else:
-                        ax.set_title(f"fps = {fps}")
+                        set_title(f"fps = {fps}")
                     skip.count = 0
 
-        self.update_funcs.append(func)  # both so that it works for both styles
+        self.on_refresh(func)  # both so that it works for both styles
 
     def on_mouse_click(self, func: Callable, pixel_mode: bool = False, ax: PlotWidget | None = None):
         """
@@ -643,30 +611,32 @@ class MainWindow(QMainWindow):
         if ax is None:
             ax = self.plot_manager.plot_widget
 
-        params = signature(func).parameters
-        has_var_args = any(
-            param.kind == param.VAR_POSITIONAL
-            for param in params.values()
-        )
-        n_args = 2 if has_var_args else len(params)
+        n_params, has_var_args = count_params(func)
+        n_args = 2 if has_var_args else n_params
 
-        if len(params) > 2:
+        if n_params > 2:
             raise ArgumentError(func, f"func should take one or two arguments, but currently takes "
-                                      f"{len(signature(func).parameters)} arguments.")
+                                      f"{n_params} arguments.")
 
-        if pixel_mode:
+        # a separate function for each number of arguments, so that nothing has to be checked on every click
+        if n_args == 0:
             def mouse_func(event):
-                pos = event.scenePos().toTuple()
-                args = ([pos, event][i] for i in range(n_args))  # handles 0, 1 or 2 n_args
-                func(*args)
-
+                func()
+        elif pixel_mode:
+            if n_args == 1:
+                def mouse_func(event):
+                    func(event.scenePos().toTuple())
+            else:
+                def mouse_func(event):
+                    func(event.scenePos().toTuple(), event)
         else:
-            def mouse_func(event):
-                pos = event.scenePos()
-                plot_pos = ax.getViewBox().mapSceneToView(pos).toTuple()
-                print(event, pos, plot_pos)
-                args = ([plot_pos, event][i] for i in range(n_args))  # handles 0, 1 or 2 n_args
-                func(*args)
+            map_to_view = ax.getViewBox().mapSceneToView
+            if n_args == 1:
+                def mouse_func(event):
+                    func(map_to_view(event.scenePos()).toTuple())
+            else:
+                def mouse_func(event):
+                    func(map_to_view(event.scenePos()).toTuple(), event)
 
         self.plot_manager.fig_widget.scene().sigMouseClicked.connect(mouse_func)
 
@@ -683,37 +653,32 @@ class MainWindow(QMainWindow):
         if ax is None:
             ax = self.plot_manager.plot_widget
 
-        params = signature(func).parameters
-        has_var_args = any(
-            param.kind == param.VAR_POSITIONAL
-            for param in params.values()
-        )
-        n_args = 1 if has_var_args else len(params)
+        n_params, has_var_args = count_params(func)
+        n_args = 1 if has_var_args else n_params
 
-        if len(params) > 1:
+        if n_params > 1:
             raise ArgumentError(func, f"func should take one or two arguments, but currently takes "
-                                      f"{len(signature(func).parameters)} arguments.")
+                                      f"{n_params} arguments.")
 
-        if pixel_mode:
+        if n_args == 0:
             def mouse_func(pos_pixel):
-                pos = pos_pixel.toTuple()
-                if n_args == 0:
-                    func()
-                else:
-                    func(pos)
+                func()
+        elif pixel_mode:
+            def mouse_func(pos_pixel):
+                func(pos_pixel.toTuple())
         else:
+            map_to_view = ax.getViewBox().mapSceneToView
             def mouse_func(pos_pixel):
-                plot_pos = ax.getViewBox().mapSceneToView(pos_pixel).toTuple()
-                if n_args == 0:
-                    func()
-                else:
-                    func(plot_pos)
+                func(map_to_view(pos_pixel).toTuple())
 
         self.plot_manager.fig_widget.scene().sigMouseMoved.connect(mouse_func)
 
     def get_mouse_pos(self, pixel_mode=False, ax: PlotWidget | None = None) -> tuple:
         """Get the position of the mouse cursor on the plot, either as pixels from the top left, or as coordinates.
 
+        This is the position of the last mouse move over the window, so it is not changed while the mouse is outside of
+        the window.
+
         Args:
             pixel_mode (bool, optional): whether to return pixels from the top left (`True`), or coordinates (`False`).
                 Defaults to `False`.
@@ -726,12 +691,17 @@ class MainWindow(QMainWindow):
         if ax is None:
             ax = self.plot_manager.plot_widget
 
-        pos = self.plot_manager.fig_widget.mapFromGlobal(QCursor.pos())
+        pos = self.mouse_pos
+        if pos is None:     # the mouse has not been moved over the window yet, so ask the window system
+            pos = self.plot_manager.fig_widget.mapFromGlobal(QCursor.pos())
         if pixel_mode:
             return pos.toTuple()
         else:
             return ax.getViewBox().mapSceneToView(pos).toTuple()
 
+    def store_mouse_pos(self, pos):
+        self.mouse_pos = pos
+
     def on_key_press(self, func: Callable, accept_modifier: bool = False, modifier_arg: bool = False,
                      event_arg: bool = False) -> Callable:
         """Bind `func` to keypress. `func` takes as argument which key is pressed. Is not great yet but good enough for
@@ -752,22 +722,28 @@ class MainWindow(QMainWindow):
         if event_arg:  # needs no changes, func takes as argument the event.
             edited_func = func
         else:
-            def edited_func(event):  # edited_func takes in event, while func takes in func
-                key = event.key()
-                print(key)
-                if not key & (1 << 24):
-                    key = chr(key)
-                if event.modifiers() == Qt.NoModifier:
-                    if modifier_arg:
-                        func(key, None)
-                    else:
-                        func(key)
-                else:
-                    if modifier_arg:
-                        func(key, event.modifiers())
+            no_modifier = Qt.NoModifier
+            # a separate function for each combination of options, so that they don't have to be checked on every key
+            if modifier_arg:
+                def edited_func(event):  # edited_func takes in event, while func takes in key
+                    key = event.key()
+                    if not key & (1 << 24):
+                        key = chr(key)
+                    modifiers = event.modifiers()
+                    func(key, None if modifiers == no_modifier else modifiers)
+            elif accept_modifier:
+                def edited_func(event):
+                    modifiers = event.modifiers()
+                    if modifiers == no_modifier:
+                        key = event.key()
+                        func(key if key & (1 << 24) else chr(key))
                     else:
-                        if accept_modifier:
-                            func(event.modifiers())
+                        func(modifiers)
+            else:
+                def edited_func(event):
+                    if event.modifiers() == no_modifier:
+                        key = event.key()
+                        func(key if key & (1 << 24) else chr(key))
 
         self.on_key_press_funcs.append(edited_func)
         return edited_func
@@ -0,0 +1,51 @@
+# Only imported when numba is enabled with `squap.enable_numba`, compiling the functions takes some time.
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True, fastmath=True)     # compiled on first use, it is only needed for dict cmaps in cmap_to_colors
+def interp_colors(x_arr, keys, col_arr, out):
+    """Same as calling np.interp(x_arr, keys, col_arr[:, c]) for every channel c, and storing the results in `out`.
+    `x_arr` and `keys` must be increasing. """
+    n_keys = keys.shape[0]
+    j = 0
+    for i in range(x_arr.shape[0]):
+        xi = x_arr[i]
+        while j < n_keys - 1 and keys[j + 1] <= xi:     # x_arr is increasing, so the search continues from the last key
+            j += 1
+        if xi <= keys[0]:
+            for c in range(4):
+                out[i, c] = col_arr[0, c]
+        elif j == n_keys - 1:
+            for c in range(4):
+                out[i, c] = col_arr[n_keys - 1, c]
+        else:
+            t = (xi - keys[j]) / (keys[j + 1] - keys[j])
+            for c in range(4):      # all channels share the search above
+                out[i, c] = col_arr[j, c] + t * (col_arr[j + 1, c] - col_arr[j, c])
+
+
+# The inputs are declared read-only, so that read-only arrays (eg. a read-only memmap passed to imshow) are accepted as
+# well. Writable arrays can always be passed where read-only ones are expected, but not the other way around.
+readonly_1d = numba.types.Array(numba.float64, 1, "A", readonly=True)
+readonly_2d = numba.types.Array(numba.float64, 2, "A", readonly=True)
+
+
+@numba.njit(numba.void(readonly_1d, readonly_1d, readonly_2d, numba.float64[:, :]), cache=True, fastmath=True)
+def apply_cmap(x_arr, keys, col_arr, out):
+    """Interpolate the colors `col_arr` defined at `keys` for every value in `x_arr`, and store them in `out`. Unlike
+    `interp_colors`, `x_arr` can be in any order, like the pixels of an image. `keys` must be increasing. """
+    n_keys = keys.shape[0]
+    for i in range(x_arr.shape[0]):
+        xi = x_arr[i]
+        j = np.searchsorted(keys, xi, side="right")    # index of the first key that is bigger than xi
+        if j == 0:
+            for c in range(4):
+                out[i, c] = col_arr[0, c]
+        elif j == n_keys:
+            for c in range(4):
+                out[i, c] = col_arr[n_keys - 1, c]
+        else:
+            t = (xi - keys[j - 1]) / (keys[j] - keys[j - 1])
+            for c in range(4):
+                out[i, c] = col_arr[j - 1, c] + t * (col_arr[j, c] - col_arr[j - 1, c])
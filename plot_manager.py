@@ -16,6 +16,7 @@ class PlotManager:
 
         self.plot_widget = PlotWidget(0, 0)
         self.axs = self.plot_widget                     # when there are no subplots, axs is the main plot widget
+        self.plot_widgets = (self.plot_widget,)         # flat tuple of all plot widgets, for searching them
         self.shape = (1, 1)
         self.fig_widget.addItem(self.plot_widget, 0, 0)  # addItem takes what is added, row, col, rowspan, colspan
 
@@ -23,19 +24,16 @@ class PlotManager:
         self.heightratios = None
 
     def clear(self):
-        if isinstance(self.axs, np.ndarray):
-            for pw in self.axs.flatten():
-                for curve in pw.curves:
-                    pw.removeItem(curve)
-        else:
-            for curve in self.axs.curves:
-                self.axs.removeItem(curve)
+        for pw in self.plot_widgets:
+            for curve in reversed(list(pw.squap_curves)):     # pyqtgraph keeps its items in lists, removing the
+                pw.remove_curve(curve)                        # last one is fastest
 
         self.plot_style_3D = False
         self.axs = PlotWidget(0, 0)
         self.shape = (1, 1)
         self.fig_widget.addItem(self.axs, 0, 0)  # addItem takes what is added, row, col, rowspan, colspan
         self.plot_widget = self.axs
+        self.plot_widgets = (self.plot_widget,)
 
         self.widthratios = None                 # for subplots
         self.heightratios = None
@@ -119,20 +117,16 @@ class PlotManager:
                 # self.fig_widget.ci.layout.setRowStretchFactor(index, width)
 
         self.axs = np.array(self.axs)
+        self.plot_widgets = tuple(self.axs.flat)
         return self.axs
 
     def remove_item(self, item: GraphicsObject):
         """
         Remove item `item` from the window. Item can be anything that can be added to a plot widget.
         """
-        if isinstance(self.axs, np.ndarray):
-            for pw in self.axs.flatten():
-                if item in pw.curves:
-                    pw.removeItem(item)
-            return
-        else:
-            if item in self.axs.curves:
-                self.axs.removeItem(item)
+        for pw in self.plot_widgets:
+            if item in pw.squap_curves:     # pw.squap_curves is a dict, so this doesn't search through all curves
+                pw.remove_curve(item)
                 return
         raise ValueError("Item has not been found")
 
@@ -149,29 +143,29 @@ class PlotManager:
         # hrs = list(np.cumsum(window.heightratios))
         # wrs = list(np.cumsum(window.widthratios))
 
-        coordinates = []  # coordinates of plots, integer starting from 0, not accounting width and heights.
-        for index, plt in enumerate(plots):
-            coordinates.append((plt.row, plt.col))
-
-        co_arr = np.array(coordinates)
-        min_x, max_x = min(co_arr[:, 0]), max(co_arr[:, 0])
-        min_y, max_y = min(co_arr[:, 1]), max(co_arr[:, 1])
-        for x in range(min_x, max_x + 1):
-            for y in range(min_y, max_y + 1):
-                if (x, y) not in coordinates:
-                    raise ValueError("The plots should form a rectangle")
-
-        for index, plt in enumerate(plots):
-            self.fig_widget.removeItem(plt)
-            del plt
+        plots = list(plots)     # iterated over twice
+        coordinates = set()     # coordinates of plots, integer starting from 0, not accounting width and heights.
+        min_x = min_y = float("inf")
+        max_x = max_y = -float("inf")
+        for plt in plots:
+            coordinates.add((plt.row, plt.col))
+            min_x, max_x = min(min_x, plt.row), max(max_x, plt.row)
+            min_y, max_y = min(min_y, plt.col), max(max_y, plt.col)
 
         height = max_x - min_x + 1
         width = max_y - min_y + 1
+        if len(coordinates) != height * width:      # all coordinates lie inside the bounding box, so all are covered
+            raise ValueError("The plots should form a rectangle")
+
+        for plt in plots:
+            self.fig_widget.removeItem(plt)
 
         # new_plot = PlotWidget(hrs[min_x], wrs[min_y])
         new_plot = PlotWidget(min_x, min_y)
 
         self.fig_widget.addItem(new_plot, min_x, min_y, height, width)
+        merged = set(plots)
+        self.plot_widgets = tuple(pw for pw in self.plot_widgets if pw not in merged) + (new_plot,)
         return new_plot
 
 
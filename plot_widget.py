@@ -5,7 +5,7 @@ from pyqtgraph import PlotDataItem, PlotItem, InfiniteLine, TextItem, ImageItem,
     getConfigOption, ErrorBarItem
 from PySide6.QtGui import QFont, QLinearGradient, QRadialGradient, QConicalGradient, QGradient, QPen, QBrush, Qt
 from .helper_funcs import is_iter, get_single_color, is_multiple_colors, cmap_to_gradient, update_pen, Font, \
-    transform_kwargs, get_cmap, get_new_kwargs, ColorType
+    transform_kwargs, get_cmap, get_new_kwargs, get_numba_func, ColorType
 from copy import copy
 from typing import Iterable, Any
 from numbers import Number      # for type hinting
@@ -16,7 +16,8 @@ class PlotWidget(PlotItem):
         super().__init__(**kwargs)
         self.row = row          # for merging subplots
         self.col = col
-        self.curves = []        # for clearing curves
+        self.squap_curves = {}  # for clearing and removing curves, used as an ordered set. Not `curves`, which is a
+        # list that PlotItem uses itself
 
     def base_plot(self, curve_type: str, *args, **kwargs):
         if len(args) == 1:
@@ -27,9 +28,7 @@ class PlotWidget(PlotItem):
         if "name" in kwargs:    # for legend
             curve.setData(name=kwargs["name"])
 
-        self.addItem(curve)
-
-        self.curves.append(curve)
+        self.add_curve(curve)
         return curve
 
     def plot_text(self, text: str, pos: Iterable[Number], color: ColorType = (200, 200, 200), angle: Number = 0,
@@ -375,8 +374,7 @@ class PlotWidget(PlotItem):
         line = InfLine(pos, **new_kwargs, **kwargs)
         # new_kwargs gets constructed from normal keyword args, but skips kwargs, which mostly just contains aliases
 
-        self.addItem(line)
-        self.curves.append(line)
+        self.add_curve(line)
         return line
 
     def inf_hline(self, pos, color="y", width=1, dashed=False, dash_pattern=None, line_style=None,
@@ -394,8 +392,7 @@ class PlotWidget(PlotItem):
         line = InfLine(pos, angle=0, **new_kwargs, **kwargs)
         # new_kwargs gets constructed from normal keyword args, but skips kwargs, which mostly just contains aliases
 
-        self.addItem(line)
-        self.curves.append(line)
+        self.add_curve(line)
         return line
 
     def inf_vline(self, pos, color="y", width=1, dashed=False, dash_pattern=None, line_style=None,
@@ -413,8 +410,7 @@ class PlotWidget(PlotItem):
         line = InfLine(pos, angle=90, **new_kwargs, **kwargs)
         # new_kwargs gets constructed from normal keyword args, but skips kwargs, which mostly just contains aliases
 
-        self.addItem(line)
-        self.curves.append(line)
+        self.add_curve(line)
         return line
 
     def grid(self, tick_spacing=None, color=None, width=1, **kwargs):
@@ -441,8 +437,7 @@ class PlotWidget(PlotItem):
 
         grid = GridCurve(**new_kwargs, **kwargs)
 
-        self.addItem(grid)
-        self.curves.append(grid)
+        self.add_curve(grid)
         return grid
 
     def set_xlim(self, x_min, x_max):
@@ -521,8 +516,13 @@ class PlotWidget(PlotItem):
     #     for curve in self.curves:
     #         curve.clear()
 
+    def add_curve(self, curve):
+        self.addItem(curve)
+        self.squap_curves[curve] = None
+
     def remove_curve(self, curve):
         self.removeItem(curve)
+        self.squap_curves.pop(curve, None)
 
 
 class PlotCurve(PlotDataItem):
@@ -693,8 +693,7 @@ class PlotCurve(PlotDataItem):
             if errorbar_kwargs:         # self.errorbar_curve needs to be set before "color" is handled
                 if self.errorbar_curve is None:
                     self.errorbar_curve = ErrorbarCurve(self)
-                    self.parent.addItem(self.errorbar_curve)
-                    self.parent.curves.append(self.errorbar_curve)
+                    self.parent.add_curve(self.errorbar_curve)
                     if "errorbar_color" not in new_kwargs:
                         errorbar_kwargs["color"] = self.pen.color()
 
@@ -1066,7 +1065,7 @@ class ImageCurve(ImageItem):
         final_kwargs = {}
         if data is not None:
             if self.cmap is not None:
-                final_kwargs["image"] = self.cmap(data)/255
+                final_kwargs["image"] = self.apply_cmap(data)
             else:
                 final_kwargs["image"] = data
 
@@ -1088,10 +1087,9 @@ class ImageCurve(ImageItem):
                     final_kwargs["rect"] = (loc[0], loc[1], loc[2]-loc[0], loc[3]-loc[1])
             self.rect = final_kwargs["rect"]
         if "cmap" in kwargs:
-            cmap = get_cmap(kwargs["cmap"])
-            self.cmap = cmap
+            self.cmap = get_cmap(kwargs["cmap"])
             if data is not None:
-                final_kwargs["image"] = cmap(data)/255      # image want values between 0 and 1
+                final_kwargs["image"] = self.apply_cmap(data)
             # print(cmap(data).shape)
 
         if "auto_levels" in kwargs:
@@ -1111,6 +1109,18 @@ class ImageCurve(ImageItem):
 
         self.setImage(**final_kwargs)
 
+    def apply_cmap(self, data):
+        """Colors of `data` in `self.cmap`, between 0 and 1 as setImage wants them. With numba enabled, the colors are
+        interpolated and scaled in a single pass over the image, without the intermediate arrays of the cmap. """
+        apply_cmap = get_numba_func("apply_cmap") if hasattr(self.cmap, "stops") else None
+        if apply_cmap is not None:
+            keys, colors = self.cmap.stops
+            data = np.ascontiguousarray(data, dtype=np.float64)
+            image = np.empty(data.shape + (4,))
+            apply_cmap(data.ravel(), keys, colors / 255, image.reshape(-1, 4))
+            return image
+        return self.cmap(data)/255
+
 
 class GridCurve(GridItem):
     kwarg_mapping = {
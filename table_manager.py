@@ -1,6 +1,8 @@
 from typing import Iterable
+from contextlib import contextmanager
 from .input_widget import InputTable, Box            # only for type hinting
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QTabWidget
+from PySide6.QtCore import QSignalBlocker
 
 
 class TableManager:
@@ -12,6 +14,7 @@ class TableManager:
 
         self.input_tables = []              # the input_widget, or all input tables in the QTabWidget if multiple tabs
         # are added
+        self.tables_by_name = {}            # name: input table, the first table with that name, see index_names
         self.main_input_widget = None       # the input_widget, or the QTabWidget if multiple tabs are added
         self.first_input_table = None       # the input_table that was added first
         self.resized = False                # if window is resized with existing input_widget but not yet shown, this is
@@ -31,8 +34,14 @@ class TableManager:
         """
         self.first_input_table.set_partition(fraction)
 
+    def index_names(self):
+        """Rebuild `tables_by_name`. Called when tables are added or renamed, so that looking up a tab by name doesn't
+        have to go through all tabs. """
+        self.tables_by_name = {table.name: table for table in reversed(self.input_tables)}     # the first one wins
+
     def create_first_table(self, input_table):
         self.input_tables.append(input_table)
+        self.index_names()
 
         self.first_input_table = input_table        # with one table, the first table is both the first table and the
         self.main_input_widget = input_table        # widget that needs to be resized.
@@ -50,20 +59,42 @@ class TableManager:
         self.tab_widget = QTabWidget()
         self.main_input_widget = self.tab_widget
         self.table_container.deleteLater()
-        self.tab_widget.addTab(self.first_input_table, self.first_input_table.name)
-        self.input_tables.append(self.first_input_table)
+        self.tab_widget.addTab(self.first_input_table, self.first_input_table.name)     # already in input_tables
 
         return
 
     def add_table(self, new_table) -> InputTable:
         self.input_tables.append(new_table)
+        self.tables_by_name.setdefault(new_table.name, new_table)
         self.tab_widget.addTab(new_table, new_table.name)
         return new_table
 
+    @contextmanager
+    def batch_tabs(self):
+        """Add or rename many tabs at once, with `with squap.batch_tabs(): ...`.
+
+        While inside the `with` block, the tab widget emits no signals and is not redrawn, so that it is only laid out
+        once at the end instead of after every tab. `currentChanged` is emitted once afterwards.
+        """
+        tab_widget = self.tab_widget
+        if tab_widget is None:      # only one table, which is not in a tab widget yet
+            yield
+            return
+
+        blocker = QSignalBlocker(tab_widget)
+        tab_widget.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            tab_widget.setUpdatesEnabled(True)
+            blocker.unblock()
+            tab_widget.currentChanged.emit(tab_widget.currentIndex())
+
     def rename_tab(self, name, index=0, old_name=None):
         if self.tab_widget is None:
             if index == 0 or old_name == self.first_input_table.name:
                 self.first_input_table.name = name
+                self.index_names()
             else:
                 if old_name is not None:
                     raise ValueError(f"{old_name} is not the current name of a tab.")
@@ -72,19 +103,19 @@ class TableManager:
             return self.first_input_table
         else:
             if old_name is not None:
-                for i, table in enumerate(self.input_tables):
-                    if table.name == old_name:
-                        self.tab_widget.setTabText(i, name)
-                        table.name = name
-                        return table
-                else:
+                table = self.tables_by_name.get(old_name)
+                if table is None:
                     raise ValueError(f"{old_name} is not the current name of a tab.")
-            else:
-                if index > len(self.input_tables):
-                    raise ValueError(f"{index} is too high. It can be at most {len(self.input_tables)-1}.")
-                self.input_tables[index].name = name
-                self.tab_widget.setTabText(index, name)
-                return self.input_tables[index]
+                index = self.input_tables.index(table)
+            elif index >= len(self.input_tables):
+                raise ValueError(f"{index} is too high. It can be at most {len(self.input_tables)-1}.")
+            table = self.input_tables[index]
+            if table.name == name:      # setTabText would make the tab bar recompute the size of every tab
+                return table
+            table.name = name
+            self.tab_widget.setTabText(index, name)
+            self.index_names()
+            return table
 
     def set_active_tab(self, *args: int | InputTable | str, index: int | None = None, tab: InputTable | None = None,
                        name: str | None = None) -> InputTable:
@@ -122,10 +153,8 @@ class TableManager:
         elif tab is not None:
             self.tab_widget.setCurrentWidget(tab)
         elif name is not None:
-            for i in range(self.tab_widget.count()):
-                if self.tab_widget.widget(i).name == name:
-                    self.tab_widget.setCurrentIndex(i)
-                    break
+            if name in self.tables_by_name:
+                self.tab_widget.setCurrentWidget(self.tables_by_name[name])
         else:
             raise ValueError("`set_active_tab` needs an argument. ")
         return self.tab_widget.currentWidget()
@@ -139,10 +168,7 @@ class TableManager:
 
     def get_all_boxes(self) -> list[Box]:
         """Return a list containing all boxes that exist at this point. """
-        result = []
-        for table in self.input_tables:
-            result.extend(table.get_boxes())
-        return result
+        return [box for table in self.input_tables for box in table.get_boxes()]
 
     def link_boxes(self, boxes: Iterable[Box | int], only_update_boxes: list | None = None):
         """Link all boxes in the list `boxes`.
@@ -157,24 +183,27 @@ class TableManager:
             only_update_boxes (list, optional): todo: I forgot what this does...
         """
         self.n_links += 1
-        if only_update_boxes is None:
-            only_update_boxes = []
+        boxes = tuple(boxes)        # iterated over by every link function, so it can't be a generator
+        only_update_ids = {id(box_) for box_ in only_update_boxes} if only_update_boxes else set()
 
-        for i, box_ in enumerate(boxes):
-            if box_ in only_update_boxes:
+        for box_ in boxes:
+            if id(box_) in only_update_ids:
                 def func():
                     return
 
             else:
-                def func(*args, box=box_, n_links=self.n_links):
+                # the boxes to update are known now, so changing a box only goes through the boxes it is linked to
+                others = tuple(other_box for other_box in boxes if other_box is not box_)
+
+                def func(*args, box=box_, others=others):
                     val = box.value()
-                    for other_box in boxes:
-                        if other_box != box and n_links in other_box.link_funcs.keys():
-                            for link_fuc in other_box.link_funcs.values():
-                                other_box.unbind(link_fuc)
-                            other_box.set_value(val)
-                            for link_fuc in other_box.link_funcs.values():
-                                other_box.bind(link_fuc)
+                    for other_box in others:
+                        link_funcs = other_box.link_funcs.values()
+                        for link_fuc in link_funcs:
+                            other_box.unbind(link_fuc)
+                        other_box.set_value(val)
+                        for link_fuc in link_funcs:
+                            other_box.bind(link_fuc)
 
             box_.link_funcs[self.n_links] = func     # enables linking box1 and box2 and box2 and box3 without
             # linking box1 and box3
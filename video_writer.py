@@ -0,0 +1,154 @@
+import os
+import os.path
+import shutil
+import subprocess
+from numbers import Number
+from functools import cache
+from queue import Queue
+from threading import Thread
+
+import numpy as np
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QWidget
+
+
+@cache
+def ffmpeg_has_encoder(encoder: str) -> bool:
+    """Whether the installed ffmpeg supports `encoder`, only checked once per encoder. """
+    result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True)
+    return f" {encoder} " in result.stdout
+
+
+class VideoWriter:
+    """Writes frames to an mp4 file while they are recorded, so that the frames don't have to be kept in memory until
+    the recording has finished. Used by `export_video` and `start_recording`.
+
+    Encoding happens in a separate thread, so that recording can continue while the previous frames are encoded. At
+    most `max_queued` frames wait to be encoded, after which `add_frame` waits until there is room again.
+
+    When ffmpeg is installed, the frames are piped to it and encoded with libx264, which is much faster than the mp4v
+    encoder of OpenCV, or with NVENC on the GPU if `gpu_encode` is True and ffmpeg supports it. Otherwise, the
+    cv2.VideoWriter is used.
+    """
+    def __init__(self, filename: str, fps: Number, max_queued: int = 64, gpu_encode: bool = False):
+        basename, extension = os.path.splitext(filename)
+        if extension and extension != '.mp4':
+            print("you can only save to mp4, if you want other filenames, you can request them")
+        self.filename = f"{basename}.mp4"
+        self.fps = fps
+
+        self.width = None           # the size of the video in pixels is only known once the first frame is added
+        self.height = None
+        self.pixel_ratio = None     # device pixels per logical pixel of the recorded widget
+        self.out = None             # the ffmpeg process or the cv2.VideoWriter, created when the first frame is added
+        self.use_ffmpeg = shutil.which("ffmpeg") is not None
+        if gpu_encode and self.use_ffmpeg and ffmpeg_has_encoder("h264_nvenc"):
+            self.codec_args = ["-c:v", "h264_nvenc", "-preset", "p1", "-rc", "vbr", "-cq", "23"]
+        else:
+            if gpu_encode:
+                print("GPU encoding is not available, because ffmpeg with NVENC support is not installed. The video is "
+                      "encoded on the CPU instead.")
+            self.codec_args = ["-c:v", "libx264", "-preset", "ultrafast"]
+        self.frame = None           # array of BGR values for cv2, reused for every frame
+        self.n_frames = 0
+
+        self.queue = Queue(maxsize=max_queued)     # frames waiting to be encoded, None means the video is finished
+        self.free_arrays = []       # arrays of encoded frames, which add_frame can reuse
+        self.thread = None
+        self.error = None           # raised again by release if encoding failed
+
+    def open(self, width: int, height: int):
+        self.width, self.height = width, height
+        if self.use_ffmpeg:
+            self.out = subprocess.Popen([
+                "ffmpeg", "-loglevel", "error", "-y",
+                "-f", "rawvideo", "-pix_fmt", "bgra", "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+                *self.codec_args, "-pix_fmt", "yuv420p",
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",     # yuv420p needs an even width and height
+                self.filename
+            ], stdin=subprocess.PIPE, bufsize=4 << 20)     # small frames are written to ffmpeg several at a time
+        else:
+            # lets the FFmpeg backend of OpenCV encode with multiple threads, unless the user set other options
+            os.environ.setdefault("OPENCV_FFMPEG_WRITER_OPTIONS", "threads;0")
+            import cv2      # only needed for saving videos, and slow to import
+            self.frame = np.empty((height, width, 3), dtype=np.uint8)
+            self.out = cv2.VideoWriter(
+                self.filename, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'avc1'), self.fps, (width, height)
+            )
+            if not self.out.isOpened():     # not every OpenCV build can encode H.264
+                self.out = cv2.VideoWriter(self.filename, cv2.VideoWriter_fourcc(*'mp4v'), self.fps, (width, height))
+        self.thread = Thread(target=self.write_frames, daemon=True)
+        self.thread.start()
+        print(f"started saving to file {self.filename} at {self.fps} fps")
+
+    def write_frames(self):
+        """Encode the queued frames until None is queued, runs in `self.thread`. """
+        use_ffmpeg, frame, get, free = self.use_ffmpeg, self.frame, self.queue.get, self.free_arrays.append
+        write = self.out.stdin.write if use_ffmpeg else self.out.write     # looked up once, not for every frame
+        if not use_ffmpeg:
+            from cv2 import cvtColor, COLOR_BGRA2BGR      # already imported by open
+
+        while (pixels := get()) is not None:
+            if self.error is not None:
+                continue                # keep emptying the queue, so that add_frame doesn't wait forever
+            try:
+                if use_ffmpeg:
+                    write(pixels.data)      # ffmpeg reads the BGRA bytes as they are, so nothing is copied
+                else:
+                    cvtColor(pixels, COLOR_BGRA2BGR, dst=frame)     # cv2 only accepts BGR, not A
+                    write(frame)
+                free(pixels)
+            except Exception as error:
+                self.error = error
+
+    def add_frame(self, widget: QWidget):
+        """Render `widget` into a new frame and queue it to be encoded by `self.thread`.
+
+        The widget is rendered straight into the memory of a numpy array, instead of grabbing a QPixmap and converting
+        that to an image. If the widget is resized while recording, the part that fits in the video is recorded.
+        """
+        if self.out is None:
+            self.pixel_ratio = widget.devicePixelRatioF()
+            self.open(round(widget.width() * self.pixel_ratio), round(widget.height() * self.pixel_ratio))
+
+        if self.free_arrays:
+            pixels = self.free_arrays.pop()
+        else:       # all arrays are still queued
+            pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        qimg = QImage(pixels.data, self.width, self.height, 4 * self.width, QImage.Format.Format_RGB32)    # BGRA bytes
+        qimg.setDevicePixelRatio(self.pixel_ratio)
+        if widget.size().toTuple() != (round(self.width / self.pixel_ratio), round(self.height / self.pixel_ratio)):
+            qimg.fill(0)            # the widget was resized, so it may not cover the entire frame
+        widget.render(qimg)
+
+        self.queue.put(pixels)
+        self.n_frames += 1
+
+    def finish_writing(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.use_ffmpeg:
+            try:
+                self.out.stdin.close()      # flushes the last frames
+            except BrokenPipeError:         # ffmpeg has already stopped, which is reported below
+                pass
+            if self.out.wait() and self.error is None:
+                self.error = RuntimeError(f"ffmpeg failed to save {self.filename}, see the error above.")
+        else:
+            self.out.release()
+
+    def release(self):
+        """Finish the video, after which no more frames can be added. """
+        if self.out is None:
+            raise RuntimeError("No frames were captured, error code 1006.")
+        self.finish_writing()
+        if self.error is not None:
+            raise self.error
+        print(f"Saving finished, {self.n_frames} frames have been saved.")
+
+    def discard(self):
+        """Stop writing and remove the file that has been written so far. """
+        if self.out is not None:
+            self.finish_writing()
+            if os.path.exists(self.filename):
+                os.remove(self.filename)